@@ -1,32 +1,39 @@
 # app.py
+import queue
+import re
+import threading
+import time
 from dotenv import load_dotenv
-load_dotenv()
-
 import streamlit as st
 from typing import List
 import globals  # shared global variable storage
-from mongo import init_mongo, save_candidate_and_answers
 
-# Import backend helpers (server.py should implement generate_questions and parse_tech_input)
-try:
-    from server import generate_questions, parse_tech_input  # type: ignore
-except Exception:
-    # fallback parse helper if server does not provide parse_tech_input
-    def parse_tech_input(s: str) -> List[str]:
-        import re
-        if not s:
-            return []
-        return [item.strip() for item in re.split(r",|\n|;", s) if item.strip()]
-
-# Optional Mongo integration (if you created mongo_store.py)
+_SPLIT_RE = re.compile(r"[,\n;]")
+
+def parse_tech_input(s: str) -> List[str]:
+    if not s:
+        return []
+    # Comma-only input (the common case) skips the regex engine
+    parts = s.split(",") if "\n" not in s and ";" not in s else _SPLIT_RE.split(s)
+    return [item.strip() for item in parts if item.strip()]
+
+# Optional Mongo integration; the warmup and the save path share mongo.py
 try:
-    from mongo_store import init_mongo, save_candidate_and_answers  # type: ignore
+    from mongo import save_candidate_and_answers, warmup_mongo
     mongo_available = True
 except Exception:
     mongo_available = False
 
 st.set_page_config(page_title="TalentScout", page_icon="🧑‍💻", layout="wide")
 
+# Load .env once per process instead of on every rerun
+@st.cache_resource(show_spinner=False)
+def _env_loaded():
+    load_dotenv()
+    return True
+
+_env_loaded()
+
 # Safe rerun helper (best-effort)
 def safe_rerun():
     try:
@@ -38,12 +45,57 @@ def safe_rerun():
         except Exception:
             return
 
-# Initialize Mongo if available (non-fatal)
-if mongo_available:
-    try:
-        init_mongo()
-    except Exception as e:
-        st.warning(f"Mongo init warning: {e}")
+# Identical tech stacks reuse the Groq output instead of issuing another call.
+# A process-wide dict (shared across sessions, like st.cache_data) is used
+# instead of st.cache_data because the streamed preview is drawn while
+# generating, and st.cache_data would record and replay those UI updates.
+GENERATE_TTL = 3600
+PREVIEW_INTERVAL = 0.1  # seconds between streamed preview redraws
+
+@st.cache_resource(show_spinner=False)
+def _question_cache():
+    # techs_key -> (stored_at, q_map); the lock guards it across session threads
+    return {}, threading.Lock()
+
+def _cached_generate(techs_key, techs, on_chunk=None):
+    """Only techs_key (normalized) is used for lookup; techs is what Groq actually sees."""
+    cache, lock = _question_cache()
+    with lock:
+        hit = cache.get(techs_key)
+    if hit and time.monotonic() - hit[0] < GENERATE_TTL:
+        return hit[1]
+    # the Groq call itself runs unlocked so sessions don't wait on each other
+    from server import submit_generate_questions
+    # Groq runs on the server's loop thread; deltas are queued back so that
+    # Streamlit calls (the preview) stay on this script thread
+    deltas = queue.SimpleQueue()
+    future = submit_generate_questions(list(techs), on_chunk=lambda label, delta: deltas.put((label, delta)))
+    while not future.done():
+        try:
+            label, delta = deltas.get(timeout=PREVIEW_INTERVAL)
+        except queue.Empty:
+            continue
+        if on_chunk:
+            on_chunk(label, delta)
+    q_map = future.result()
+    now = time.monotonic()
+    with lock:
+        for key in [k for k, (ts, _) in cache.items() if now - ts >= GENERATE_TTL]:
+            del cache[key]
+        cache[techs_key] = (now, q_map)
+    return q_map
+
+def _stream_preview(placeholder):
+    """Build an on_chunk(label, delta) callback that redraws placeholder at most every PREVIEW_INTERVAL."""
+    parts = {}
+    last_draw = [0.0]
+    def on_chunk(label, delta):
+        parts.setdefault(label, []).append(delta)
+        now = time.monotonic()
+        if now - last_draw[0] >= PREVIEW_INTERVAL:
+            last_draw[0] = now
+            placeholder.code("\n\n".join("".join(p) for p in parts.values()), language="json")
+    return on_chunk
 
 # Session state initialization
 if "candidate" not in st.session_state:
@@ -52,8 +104,6 @@ if "generated_questions" not in st.session_state:
     st.session_state.generated_questions = {}
 if "question_texts" not in st.session_state:
     st.session_state.question_texts = {}
-if "answers" not in st.session_state:
-    st.session_state.answers = {}
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "step" not in st.session_state:
@@ -61,8 +111,63 @@ if "step" not in st.session_state:
 if "terminated" not in st.session_state:
     st.session_state.terminated = False
 
+# Build the Mongo client, its indexes and the first handshake in the background
+# (once per process) so they overlap with form entry instead of blocking the
+# first render or the first submit. Failures are logged; the save path retries.
+@st.cache_resource(show_spinner=False)
+def _start_mongo_warmup():
+    thread = threading.Thread(target=warmup_mongo, daemon=True)
+    thread.start()
+    return thread
+
+if mongo_available:
+    _start_mongo_warmup()
+
+# Keep session history bounded; only the tail is ever rendered
+MAX_HISTORY = 50
+RENDERED_HISTORY = 20
+INLINE_HISTORY = 5
+
 def add_message(speaker: str, text: str):
     st.session_state.chat_history.append({"speaker": speaker, "text": text})
+    if len(st.session_state.chat_history) > MAX_HISTORY:
+        st.session_state.chat_history = st.session_state.chat_history[-MAX_HISTORY:]
+
+def handle_command():
+    # Runs once per submitted command (on_change), then clears the box so reruns don't repeat it
+    cmd = st.session_state.cmd_input
+    if not cmd:
+        return
+    add_message("user", cmd)
+    if cmd.strip().lower() in {"exit", "quit", "bye"}:
+        add_message("bot", "Received exit command. Ending session. Good luck!")
+        st.session_state.terminated = True
+    else:
+        add_message("bot", "Quick commands supported: `exit`.")
+    st.session_state.cmd_input = ""
+
+def render_message(msg):
+    if msg["speaker"] == "bot":
+        st.markdown(f"**Bot:** {msg['text']}")
+    else:
+        st.markdown(f"**You:** {msg['text']}")
+
+def _extract_question(it):
+    if isinstance(it, dict):
+        q = it.get("question") or it.get("q") or it.get("prompt") or ""
+        if not q:
+            q = next((str(v) for v in it.values() if isinstance(v, str)), str(it))
+        focus = it.get("ideal_answer_focus") or it.get("focus") or ""
+        return q, str(focus)
+    return str(it), ""
+
+def _walk_q_map(q_map):
+    """Yield (tech, idx, {"question", "ideal_answer_focus"}) for every question in a Groq map."""
+    for tech, items in (q_map or {}).items():
+        items = items if isinstance(items, (list, tuple)) else [items]
+        for idx, it in enumerate(items, start=1):
+            q, focus = _extract_question(it)
+            yield str(tech), idx, {"question": q.strip(), "ideal_answer_focus": focus.strip()}
 
 # Header / instructions
 st.title("🧑‍💻TalentScout")
@@ -78,48 +183,55 @@ with left:
     st.subheader("Conversation")
     if not st.session_state.chat_history:
         add_message("bot", "Hello! Please provide your details using the form on the right.")
-    for msg in st.session_state.chat_history:
-        if msg["speaker"] == "bot":
-            st.markdown(f"**Bot:** {msg['text']}")
-        else:
-            st.markdown(f"**You:** {msg['text']}")
+    # Older messages stay collapsed; only the latest few are rendered inline
+    tail = st.session_state.chat_history[-RENDERED_HISTORY:]
+    older, recent = tail[:-INLINE_HISTORY], tail[-INLINE_HISTORY:]
+    if older:
+        with st.expander("Conversation history", expanded=False):
+            for msg in older:
+                render_message(msg)
+    for msg in recent:
+        render_message(msg)
     st.markdown("---")
 
     # Display generated questions (if any) and collect answers
     if st.session_state.generated_questions:
         st.header("Answer the questions")
-        for tech, items in st.session_state.generated_questions.items():
-            st.subheader(tech)
-            for idx, item in enumerate(items, start=1):
-                qkey = f"{tech} Question{idx}"
-                question_text = item.get("question") if isinstance(item, dict) else str(item)
-                if not question_text:
-                    question_text = st.session_state.question_texts.get(qkey, "")
-                st.markdown(f"**Q{idx}.** {question_text}")
-                textarea_key = qkey + "_ta"
-                prev = st.session_state.answers.get(qkey, "")
-                ans = st.text_area(label=f"Your answer for {qkey}", value=prev, key=textarea_key, height=140)
-                st.session_state.answers[qkey] = ans
-                # show ideal focus if present
-                focus = item.get("ideal_answer_focus", "") if isinstance(item, dict) else ""
-                if focus:
-                    st.caption("Ideal answer focus: " + focus)
+        # One tab per tech keeps the page short; widget keys stay stable across reruns
+        techs = list(st.session_state.generated_questions.keys())
+        for tab, tech in zip(st.tabs(techs), techs):
+            items = st.session_state.generated_questions[tech]
+            with tab:
+                for idx, item in enumerate(items, start=1):
+                    qkey = f"{tech}__q{idx}"
+                    question_text = item.get("question") if isinstance(item, dict) else str(item)
+                    if not question_text:
+                        question_text = st.session_state.question_texts.get(qkey, "")
+                    st.markdown(f"**Q{idx}.** {question_text}")
+                    # The widget key backs the answer in session_state; it is read on submit
+                    st.text_area(label=f"Your answer for {tech} Q{idx}", key=qkey + "_ta", height=140)
+                    # show ideal focus if present
+                    focus = item.get("ideal_answer_focus", "") if isinstance(item, dict) else ""
+                    if focus:
+                        st.caption("Ideal answer focus: " + focus)
 
         if st.button("Finish & Submit Answers"):
-            # Build candidate dict and answers list
-            candidate = st.session_state.candidate.copy() if st.session_state.candidate else {}
-            # Ensure tech_stack is present — prefer globals.techstack
-            candidate["tech_stack"] = globals.techstack if getattr(globals, "techstack", None) else candidate.get("tech_stack", [])
-
-            answers_list = []
-            for key, ans_text in st.session_state.answers.items():
-                q_text = st.session_state.question_texts.get(key, "")
-                tech_part = key.split("__", 1)[0] if "__" in key else "General"
-                answers_list.append({
-                    "tech": tech_part,
+            # Build the save payload without mutating session state;
+            # tech_stack prefers globals.techstack
+            cand = st.session_state.candidate
+            candidate = {
+                **cand,
+                "tech_stack": globals.techstack if getattr(globals, "techstack", None) else cand.get("tech_stack", []),
+            }
+
+            answers_list = [
+                {
+                    "tech": key.split("__", 1)[0] if "__" in key else "General",
                     "question": q_text,
-                    "answer": ans_text
-                })
+                    "answer": st.session_state.get(key + "_ta", ""),
+                }
+                for key, q_text in st.session_state.question_texts.items()
+            ]
 
             # Save to Mongo if available, otherwise show a confirmation message
             if mongo_available:
@@ -155,14 +267,7 @@ with left:
 with right:
     st.subheader("Controls & Forms")
 
-    cmd = st.text_input("Quick command (type 'exit' to stop):", key="cmd_input")
-    if cmd:
-        add_message("user", cmd)
-        if cmd.strip().lower() in {"exit", "quit", "bye"}:
-            add_message("bot", "Received exit command. Ending session. Good luck!")
-            st.session_state.terminated = True
-        else:
-            add_message("bot", "Quick commands supported: `exit`.")
+    st.text_input("Quick command (type 'exit' to stop):", key="cmd_input", on_change=handle_command)
 
     # Candidate details form
     if st.session_state.step == "collect_info":
@@ -212,20 +317,21 @@ with right:
             tools = st.text_area("Tools / DevOps / Cloud (comma separated)", value=",".join(st.session_state.candidate.get("tools",[])))
             submit_tech = st.form_submit_button("Generate Questions (Groq)")
         if submit_tech:
-            techstack: List[str] = []
-            for s in (langs, frameworks, dbs, tools):
-                parsed = parse_tech_input(s)
-                techstack.extend(parsed)
+            # Parse each field once and reuse the results below
+            parsed_langs, parsed_frameworks, parsed_dbs, parsed_tools = (
+                parse_tech_input(s) for s in (langs, frameworks, dbs, tools)
+            )
+            techstack: List[str] = parsed_langs + parsed_frameworks + parsed_dbs + parsed_tools
 
             if not techstack:
                 st.error("Please enter at least one technology.")
             else:
                 # Update candidate tech fields and global techstack
                 st.session_state.candidate.update({
-                    "languages": parse_tech_input(langs),
-                    "frameworks": parse_tech_input(frameworks),
-                    "databases": parse_tech_input(dbs),
-                    "tools": parse_tech_input(tools),
+                    "languages": parsed_langs,
+                    "frameworks": parsed_frameworks,
+                    "databases": parsed_dbs,
+                    "tools": parsed_tools,
                 })
 
                 # --- update the global techstack as requested ---
@@ -236,51 +342,25 @@ with right:
                 # Call Groq-powered generator (server.generate_questions) and robustly normalize
                 try:
                     with st.spinner("Generating questions via Groq — this may take a few seconds..."):
-                        raw_q_map = generate_questions(globals.techstack)
+                        techs_key = tuple(sorted({t.lower() for t in globals.techstack}))
+                        # Live preview of the streamed output, cleared once the JSON is parsed
+                        preview = st.empty()
+                        try:
+                            raw_q_map = _cached_generate(techs_key, globals.techstack, on_chunk=_stream_preview(preview))
+                        finally:
+                            preview.empty()
                 except Exception as e:
                     st.error(f"Failed to generate questions with Groq: {e}")
                     raw_q_map = {}
 
-                # Normalization helper
-                def normalize_q_map(q_map):
-                    normalized = {}
-                    if not q_map:
-                        return normalized
-                    for tech, items in q_map.items():
-                        tech_label = str(tech)
-                        new_list = []
-
-                        if isinstance(items, str):
-                            new_list.append({"question": items.strip(), "ideal_answer_focus": ""})
-                        elif isinstance(items, (list, tuple)):
-                            for it in items:
-                                if isinstance(it, str):
-                                    new_list.append({"question": it.strip(), "ideal_answer_focus": ""})
-                                elif isinstance(it, dict):
-                                    q = it.get("question") or it.get("q") or it.get("prompt") or ""
-                                    if not q:
-                                        q = next((str(v) for v in it.values() if isinstance(v, str)), str(it))
-                                    focus = it.get("ideal_answer_focus") or it.get("focus") or ""
-                                    if not isinstance(focus, str):
-                                        focus = str(focus)
-                                    new_list.append({"question": q.strip(), "ideal_answer_focus": focus.strip()})
-                                else:
-                                    new_list.append({"question": str(it).strip(), "ideal_answer_focus": ""})
-                        else:
-                            new_list.append({"question": str(items).strip(), "ideal_answer_focus": ""})
-
-                        normalized[tech_label] = new_list
-                    return normalized
-
-                norm_q_map = normalize_q_map(raw_q_map)
+                # Normalize the Groq output and build the flat question-text map in one pass
+                norm_q_map = {}
+                question_texts = {}
+                for tech, idx, qdict in _walk_q_map(raw_q_map):
+                    norm_q_map.setdefault(tech, []).append(qdict)
+                    question_texts[f"{tech}__q{idx}"] = qdict["question"]
                 st.session_state.generated_questions = norm_q_map
-
-                # create flat mapping for question texts
-                st.session_state.question_texts = {}
-                for tech, items in norm_q_map.items():
-                    for idx, item in enumerate(items, start=1):
-                        key = f"{tech}__q{idx}"
-                        st.session_state.question_texts[key] = item.get("question", "")
+                st.session_state.question_texts = question_texts
 
                 st.success("Questions generated. Answer them on the left panel.")
                 st.session_state.step = "show_questions"
@@ -310,7 +390,6 @@ with st.sidebar:
         st.write("No candidate data yet.")
 
     if st.button("Reset Session"):
-        for k in list(st.session_state.keys()):
-            del st.session_state[k]
+        st.session_state.clear()
         # keep globals.techstack untouched unless you want to reset it too
         safe_rerun()
@@ -1,10 +1,12 @@
 # mongo.py
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, Tuple
 from datetime import datetime
+import logging
 import os
+import threading
 import traceback
 
-from pymongo import MongoClient, errors
+from pymongo import MongoClient, ReturnDocument, UpdateOne, errors
 from pymongo.collection import Collection
 from bson import ObjectId
 
@@ -12,6 +14,21 @@ from bson import ObjectId
 DEFAULT_DB_NAME = "interview"
 DEFAULT_COLLECTION = "candidates"
 
+logger = logging.getLogger(__name__)
+
+
+_INDEX_SPECS = [
+    # ensure email unique for candidate upserts
+    ("email", {"unique": True}),
+    # list_candidates sorts newest first
+    ([("created_at", -1)], {}),
+    # latest-answers lookups per candidate
+    ([("email", 1), ("answers.timestamp", -1)], {}),
+]
+
+# databases whose indexes were created successfully in this process
+_indexed_dbs: Set[str] = set()
+
 
 # -----------------------
 # Low-level DB client
@@ -29,22 +46,48 @@ class MongoDB:
         if self._client:
             return
         try:
-            self._client = MongoClient(self._uri, serverSelectionTimeoutMS=5000)
-            # Force connection to verify credentials/availability
-            self._client.server_info()
+            # pymongo connects lazily; the first operation (index creation) does the handshake
+            self._client = MongoClient(
+                self._uri,
+                maxPoolSize=50,
+                minPoolSize=5,
+                serverSelectionTimeoutMS=3000,
+                socketTimeoutMS=10000,
+                retryWrites=True,
+            )
             self._db = self._client[self._db_name]
             self._candidates = self._db[DEFAULT_COLLECTION]
             self._ensure_indexes()
-        except errors.ServerSelectionTimeoutError as ex:
+        except errors.PyMongoError as ex:
+            # close the pool/monitors and leave the instance unconnected so a later connect() retries
+            self.close()
             raise ConnectionError(f"Could not connect to MongoDB: {ex}")
 
-    def _ensure_indexes(self) -> None:
+    def ping(self) -> None:
+        """
+        Cheap round-trip to verify the server is reachable ({"ok": 1} instead of buildInfo).
+        """
+        if self._client is None:
+            raise ConnectionError("MongoDB client is closed.")
         try:
-            # ensure email unique for candidate upserts
-            self._candidates.create_index("email", unique=True)
-        except Exception:
-            # index creation should not break app startup; log to stdout
-            print("Warning: index creation issue (maybe duplicates exist).")
+            self._client.admin.command("ping")
+        except errors.PyMongoError as ex:
+            raise ConnectionError(f"Could not connect to MongoDB: {ex}")
+
+    def _ensure_indexes(self) -> None:
+        # once per process per database, recorded only after the indexes exist
+        if self._db_name in _indexed_dbs:
+            return
+        ok = True
+        for keys, opts in _INDEX_SPECS:
+            try:
+                self._candidates.create_index(keys, **opts)
+            except errors.OperationFailure as ex:
+                # one failing index (e.g. duplicate emails) must not skip the others
+                logger.warning("Index creation issue for %s (maybe duplicates exist): %s", keys, ex)
+                ok = False
+        if ok:
+            _indexed_dbs.add(self._db_name)
 
     def insert_candidate(self, candidate: Dict[str, Any]) -> ObjectId:
         doc = dict(candidate)
@@ -79,14 +122,56 @@ class MongoDB:
             upsert=bool(upsert_candidate_if_missing),
         )
 
-    def get_candidate_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        return self._candidates.find_one({"email": email})
+    def push_answers_bulk(self, email: str, profile: Dict[str, Any], answers: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Upsert the profile and append all answers in a single round-trip.
+        Returns the candidate document projected to its _id.
+        """
+        p = dict(profile)
+        p.pop("answers", None)
+        p["updated_at"] = datetime.utcnow()
+        return self._candidates.find_one_and_update(
+            {"email": email},
+            {
+                "$set": p,
+                "$setOnInsert": {"created_at": datetime.utcnow()},
+                "$push": {"answers": {"$each": answers}},
+            },
+            upsert=True,
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def bulk_upsert_candidates(self, updates: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]]):
+        """
+        Upsert many candidates (email, profile, answers) in one unordered bulk_write.
+        Returns the pymongo BulkWriteResult, or None when there is nothing to write.
+        """
+        if not updates:
+            return None
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {"email": e},
+                {
+                    "$set": {**{k: v for k, v in p.items() if k != "answers"}, "updated_at": now},
+                    "$setOnInsert": {"created_at": now},
+                    "$push": {"answers": {"$each": a}},
+                },
+                upsert=True,
+            )
+            for e, p, a in updates
+        ]
+        return self._candidates.bulk_write(ops, ordered=False)
+
+    def get_candidate_by_email(self, email: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return self._candidates.find_one({"email": email}, projection)
 
     def list_candidates(self, limit: int = 50) -> List[Dict[str, Any]]:
         return list(self._candidates.find().sort("created_at", -1).limit(limit))
 
     def get_candidate_with_last_n_answers(self, email: str, n: int = 5) -> Optional[Dict[str, Any]]:
-        return self._candidates.find_one({"email": email}, {"answers": {"$slice": -n}, "name": 1, "email": 1, "phone": 1, "position": 1, "meta": 1, "created_at": 1})
+        return self._candidates.find_one({"email": email}, {"_id": 1, "answers": {"$slice": -n}, "name": 1, "email": 1, "phone": 1, "position": 1, "meta": 1, "created_at": 1})
 
     def close(self) -> None:
         if self._client:
@@ -100,6 +185,7 @@ class MongoDB:
 # Singleton accessor
 # -----------------------
 _db_instance: Optional[MongoDB] = None
+_db_lock = threading.Lock()
 
 
 def get_db(uri: Optional[str] = None, db_name: str = DEFAULT_DB_NAME) -> MongoDB:
@@ -107,8 +193,10 @@ def get_db(uri: Optional[str] = None, db_name: str = DEFAULT_DB_NAME) -> MongoDB
     Return a singleton MongoDB instance. Safe to call multiple times.
     """
     global _db_instance
-    if _db_instance is None:
-        _db_instance = MongoDB(uri=uri, db_name=db_name)
+    # may be called from the warmup thread and the script thread at once
+    with _db_lock:
+        if _db_instance is None:
+            _db_instance = MongoDB(uri=uri, db_name=db_name)
     return _db_instance
 
 
@@ -134,6 +222,20 @@ def init_mongo(uri: Optional[str] = None, db_name: Optional[str] = None) -> None
         raise RuntimeError(f"Failed to initialize MongoDB: {e}")
 
 
+def warmup_mongo() -> None:
+    """
+    Initialize the DB wrapper and complete the server handshake ahead of the
+    first save. Index creation is skipped once a database is indexed, so an
+    explicit ping makes sure the pool has actually reached the server.
+    Intended to run in a background thread; failures are logged, not raised.
+    """
+    try:
+        init_mongo()
+        _db_wrapper.ping()
+    except Exception as ex:
+        logger.warning("MongoDB warmup failed: %s", ex)
+
+
 def _normalize_answer_input(ans: Dict[str, Any]) -> Dict[str, Any]:
     a = dict(ans or {})
     a.setdefault("question_id", a.get("question_id") or a.get("qid") or None)
@@ -145,13 +247,7 @@ def _normalize_answer_input(ans: Dict[str, Any]) -> Dict[str, Any]:
     return a
 
 
-def save_candidate_and_answers(candidate: Dict[str, Any], answers_list: List[Dict[str, Any]]) -> str:
-    """
-    Upsert candidate by email and push answers to the candidate.answers array.
-    Returns the candidate _id as string.
-    Raises RuntimeError on failure.
-    """
-    global _db_wrapper
+def _ensure_wrapper() -> None:
     if _db_wrapper is None:
         # try auto-init (uses MONGO_URI env or localhost)
         try:
@@ -159,6 +255,8 @@ def save_candidate_and_answers(candidate: Dict[str, Any], answers_list: List[Dic
         except Exception as e:
             raise ConnectionError(f"MongoDB not initialized and auto-init failed: {e}")
 
+
+def _build_profile(candidate: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
     if not isinstance(candidate, dict):
         raise ValueError("candidate must be a dict")
 
@@ -175,26 +273,37 @@ def save_candidate_and_answers(candidate: Dict[str, Any], answers_list: List[Dic
         "meta": candidate.get("meta", {"status": "in_progress"}),
         "tech_stack": candidate.get("tech_stack", []),
     }
+    return email, profile
+
+
+def _build_answers(answers_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    answers = [_normalize_answer_input(a) for a in answers_list or []]
+    return [
+        {
+            "question_id": a.get("question_id"),
+            "question": a.get("question"),
+            "answer": a.get("answer"),
+            "tech": a.get("tech"),
+            "score": a.get("score"),
+            "timestamp": a.get("timestamp"),
+        }
+        for a in answers
+    ]
+
+
+def save_candidate_and_answers(candidate: Dict[str, Any], answers_list: List[Dict[str, Any]]) -> str:
+    """
+    Upsert candidate by email and push answers to the candidate.answers array.
+    Returns the candidate _id as string.
+    Raises RuntimeError on failure.
+    """
+    _ensure_wrapper()
+    email, profile = _build_profile(candidate)
+    answers = _build_answers(answers_list)
 
     try:
-        # upsert profile
-        _db_wrapper.upsert_candidate(email=email, profile=profile)
-
-        # push answers
-        for raw in answers_list or []:
-            norm = _normalize_answer_input(raw)
-            ans_doc = {
-                "question_id": norm.get("question_id"),
-                "question": norm.get("question"),
-                "answer": norm.get("answer"),
-                "tech": norm.get("tech"),
-                "score": norm.get("score"),
-                "timestamp": norm.get("timestamp"),
-            }
-            _db_wrapper.add_answer(email, ans_doc)
-
-        # return _id
-        doc = _db_wrapper.get_candidate_by_email(email)
+        # upsert profile and push answers in one round-trip
+        doc = _db_wrapper.push_answers_bulk(email, profile, answers)
         if not doc:
             raise RuntimeError("Failed to retrieve candidate after save.")
         cid = doc.get("_id")
@@ -202,3 +311,26 @@ def save_candidate_and_answers(candidate: Dict[str, Any], answers_list: List[Dic
     except Exception as ex:
         tb = traceback.format_exc()
         raise RuntimeError(f"Failed to save candidate and answers: {ex}\n\n{tb}")
+
+
+def save_candidates_bulk(items: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> int:
+    """
+    Batch variant of save_candidate_and_answers for (candidate, answers_list) pairs.
+    All candidates are written in a single unordered bulk_write.
+    Returns the number of candidates matched or inserted.
+    Raises RuntimeError on failure.
+    """
+    _ensure_wrapper()
+    updates = []
+    for candidate, answers_list in items or []:
+        email, profile = _build_profile(candidate)
+        updates.append((email, profile, _build_answers(answers_list)))
+
+    try:
+        res = _db_wrapper.bulk_upsert_candidates(updates)
+        if res is None:
+            return 0
+        return res.matched_count + res.upserted_count
+    except Exception as ex:
+        tb = traceback.format_exc()
+        raise RuntimeError(f"Failed to save candidates in bulk: {ex}\n\n{tb}")
@@ -1,25 +1,54 @@
 # server.py (top section)
 import os
-import json
-from typing import List, Dict, Any
+import asyncio
+import concurrent.futures
+import functools
+import threading
+from typing import List, Dict, Any, Callable, Optional
+import orjson
 from dotenv import load_dotenv
 # Import groq client safely (won't raise import-time exceptions)
 load_dotenv()
 
 try:
-    from groq import Groq
+    import httpx
+    from groq import AsyncGroq
 except Exception:
-    Groq = None  # graceful fallback when library is not installed
+    AsyncGroq = None  # graceful fallback when library is not installed
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-# create client only when possible, but guard against constructor errors
-groq_client = None
-if Groq and GROQ_API_KEY:
-    try:
-        groq_client = Groq(api_key=GROQ_API_KEY)
-    except Exception:
-        groq_client = None
+def _http_client_kwargs() -> Dict[str, Any]:
+    return {
+        "http2": True,
+        "limits": httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60.0),
+        "timeout": httpx.Timeout(60.0, connect=5.0),
+    }
+
+# One long-lived event loop thread owns the async Groq client, so its pooled
+# keep-alive HTTP/2 connections survive across generations (asyncio.run would
+# create a fresh loop, and therefore fresh connections, on every call).
+# Both are created lazily on first use, not at import / cold start.
+_groq_lock = threading.Lock()
+_groq_loop: Optional[asyncio.AbstractEventLoop] = None
+_groq_client = None
+
+def _get_groq():
+    """Return (loop, client), starting the loop thread and building the client on first use."""
+    global _groq_loop, _groq_client
+    # sessions run on separate threads; only one of them may create the singleton
+    with _groq_lock:
+        if _groq_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="groq-loop", daemon=True).start()
+            # create client only when possible, but guard against constructor errors
+            if AsyncGroq and GROQ_API_KEY:
+                try:
+                    _groq_client = AsyncGroq(api_key=GROQ_API_KEY, http_client=httpx.AsyncClient(**_http_client_kwargs()))
+                except Exception:
+                    _groq_client = None
+            _groq_loop = loop
+    return _groq_loop, _groq_client
 
 # Helper: build prompt requesting strict JSON output
 _PROMPT_TEMPLATE = """You are a senior technical interviewer. For each technology in the list below, generate **between 3 and 5** open-ended technical interview questions that deeply test practical proficiency (no trivial/yes-no questions). 
@@ -47,52 +76,69 @@ Requirements:
 Technologies: {tech_list}
 """
 
-def _call_groq_for_questions(techs: List[str], max_tokens: int = 900, temperature: float = 0.7) -> str:
-    if not groq_client:
-        raise RuntimeError(
-            "Groq client not configured. Install `groq` and set GROQ_API_KEY environment variable."
-        )
+# Pre-split the template around {tech_list} (undoing the brace escapes) so
+# building a prompt is plain concatenation instead of a format() parse.
+_PROMPT_PREFIX, _PROMPT_SUFFIX = (
+    _PROMPT_TEMPLATE.replace("{{", "{").replace("}}", "}").split("{tech_list}")
+)
+
+def _build_messages(techs: List[str]) -> List[Dict[str, str]]:
     tech_list = ", ".join(techs)
-    prompt = _PROMPT_TEMPLATE.format(tech_list=tech_list)
+    prompt = _PROMPT_PREFIX + tech_list + _PROMPT_SUFFIX
     # Build a conversation with system + user to encourage structured output
-    messages = [
+    return [
         {"role": "system", "content": "You are a precise JSON-producing assistant."},
         {"role": "user", "content": prompt},
     ]
-    # Call Groq chat completion
-    resp = groq_client.chat.completions.create(
-        model="llama-3.1-8b-instant",  # change model if you prefer another Groq model available to you
+
+# Each tech needs roughly this many completion tokens for 3-5 questions + focus notes
+_TOKENS_PER_TECH = 350
+_MIN_MAX_TOKENS = 900
+
+def _chunk_techs(techs: List[str], max_per_call: int = 4) -> List[List[str]]:
+    # Split the tech list so a single completion never runs out of tokens
+    return [techs[i:i + max_per_call] for i in range(0, len(techs), max_per_call)]
+
+def _max_tokens_for(techs: List[str]) -> int:
+    return max(_MIN_MAX_TOKENS, _TOKENS_PER_TECH * len(techs))
+
+async def _call_groq_async(
+    client,
+    techs: List[str],
+    max_tokens: int = 900,
+    temperature: float = 0.7,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> str:
+    messages = _build_messages(techs)
+    resp = await client.chat.completions.create(
+        model="llama-3.1-8b-instant",
         messages=messages,
         temperature=temperature,
         max_tokens=max_tokens,
+        stream=True,
     )
-    # Extract text content
+    buf: List[str] = []
     try:
-        content = resp.choices[0].message.content
-        return content
+        async for chunk in resp:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                buf.append(delta)
+                if on_chunk:
+                    on_chunk(delta)
     except Exception as e:
         raise RuntimeError(f"Groq response parsing failed: {e}")
+    return "".join(buf)
 
-def generate_questions(techs: List[str]) -> Dict[str, List[Dict[str,str]]]:
-    """
-    Given a list of tech strings, return a mapping:
-       tech_name -> [ { "question": "...", "ideal_answer_focus": "..." }, ... ]
-    This function ALWAYS uses Groq. If Groq fails, it raises an exception.
-    """
-    if not techs:
-        return {}
-
+def _clean_techs(techs: List[str]) -> List[str]:
     # Normalize techs to simple strings
-    techs_clean = [t.strip() for t in techs if t and t.strip()]
-    if not techs_clean:
-        return {}
-
-    # Call Groq
-    raw = _call_groq_for_questions(techs_clean)
+    return [t.strip() for t in techs or [] if t and t.strip()]
 
-    # Try to parse JSON directly. Groq should return JSON-only per prompt.
+def _parse_questions(raw: str, techs_clean: List[str]) -> Dict[str, List[Dict[str,str]]]:
+    # Streamed output can't use Groq's JSON mode; rely on the JSON-only prompt and validate here.
     try:
-        parsed = json.loads(raw)
+        parsed = orjson.loads(raw)
+        if not isinstance(parsed, dict):
+            raise ValueError("Groq output is not a JSON object")
         # Validate shape: ensure each tech maps to a list of dicts with "question"
         out: Dict[str, List[Dict[str,str]]] = {}
         for tech in techs_clean:
@@ -110,8 +156,63 @@ def generate_questions(techs: List[str]) -> Dict[str, List[Dict[str,str]]]:
             else:
                 raise ValueError(f"Groq JSON missing expected key for tech: {tech!r}")
         return out
-    except json.JSONDecodeError:
-        # If Groq did not produce parseable JSON, surface a helpful error with original content
-        raise RuntimeError("Groq did not return valid JSON. Raw output:\n\n" + raw)
-    except Exception as e:
+    except ValueError as e:
+        # Covers both malformed JSON (orjson.JSONDecodeError) and shape errors above
         raise RuntimeError(f"Failed to parse Groq output: {e}\n\nRaw output:\n\n{raw}")
+
+def generate_questions(techs: List[str]) -> Dict[str, List[Dict[str,str]]]:
+    """
+    Given a list of tech strings, return a mapping:
+       tech_name -> [ { "question": "...", "ideal_answer_focus": "..." }, ... ]
+    This function ALWAYS uses Groq. If Groq fails, it raises an exception.
+    """
+    return submit_generate_questions(techs).result()
+
+def submit_generate_questions(
+    techs: List[str],
+    on_chunk: Optional[Callable[[str, str], None]] = None,
+) -> concurrent.futures.Future:
+    """
+    Schedule generate_questions_async on the shared Groq loop and return a
+    concurrent Future. on_chunk, if given, is called on the loop thread.
+    """
+    return asyncio.run_coroutine_threadsafe(generate_questions_async(techs, on_chunk=on_chunk), _get_groq()[0])
+
+async def generate_questions_async(
+    techs: List[str],
+    on_chunk: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, List[Dict[str,str]]]:
+    """
+    Async variant of generate_questions. The tech list is split into small
+    groups that are requested concurrently over the shared AsyncGroq client,
+    and the results are merged in input order. The client's connections are
+    bound to the shared loop, so run this via submit_generate_questions.
+    If on_chunk is given it is called as on_chunk(label, delta) for every
+    streamed piece of text (label is the group's comma-joined techs);
+    JSON is only parsed once a stream completes.
+    """
+    techs_clean = _clean_techs(techs)
+    if not techs_clean:
+        return {}
+    client = _get_groq()[1]
+    if not client:
+        raise RuntimeError(
+            "Groq client not configured. Install `groq` and set GROQ_API_KEY environment variable."
+        )
+
+    chunks = _chunk_techs(techs_clean)
+    # concurrent chunk requests are multiplexed over the pooled HTTP/2 connection
+    raws = await asyncio.gather(*[
+        _call_groq_async(
+            client,
+            chunk,
+            max_tokens=_max_tokens_for(chunk),
+            on_chunk=functools.partial(on_chunk, ", ".join(chunk)) if on_chunk else None,
+        )
+        for chunk in chunks
+    ])
+
+    out: Dict[str, List[Dict[str,str]]] = {}
+    for chunk, raw in zip(chunks, raws):
+        out.update(_parse_questions(raw, chunk))
+    return out